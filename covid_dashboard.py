@@ -4,6 +4,7 @@ Author: Jasmit Singh Dhall
 Description: Interactive dashboard for analyzing global COVID-19 trends with visualizations
 """
 
+import os
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -12,6 +13,11 @@ import streamlit as st
 from datetime import datetime
 import requests
 from io import StringIO
+from data_fetch import fetch_urls_sync
+from covid_metrics import (
+    ROLLING_WINDOWS, ROLLING_METRICS, GROWTH_METRICS, DOUBLING_METRICS,
+    DERIVED_METRICS, RATE_METRICS, add_derived_metrics
+)
 
 # Page configuration
 st.set_page_config(page_title="COVID-19 Global Dashboard", layout="wide", page_icon="🦠")
@@ -30,35 +36,64 @@ st.title("🦠 COVID-19 Global Data Analysis Dashboard")
 st.markdown("**Real-time analysis of global pandemic trends with interactive visualizations**")
 st.markdown("---")
 
+# Data backend: "pandas" keeps the full frame in memory, "duckdb" runs the
+# dashboard queries out-of-core against a local Parquet file
+DATA_BACKEND = os.environ.get("COVID_BACKEND", "pandas")
+if DATA_BACKEND == "duckdb":
+    import covid_duckdb
+
 @st.cache_data(ttl=3600)
 def load_data():
-    """Load COVID-19 data from Our World in Data"""
+    """Load COVID-19 data from Our World in Data (a DataFrame, or a Parquet path for the DuckDB backend)"""
     try:
         url = "https://covid.ourworldindata.org/data/owid-covid-data.csv"
-        df = pd.read_csv(url)
+        path = fetch_urls_sync({"owid-covid-data.csv": url})["owid-covid-data.csv"]
+        if isinstance(path, Exception):
+            raise path
+        if DATA_BACKEND == "duckdb":
+            return covid_duckdb.build_parquet(
+                path, ROLLING_WINDOWS, ROLLING_METRICS, GROWTH_METRICS, DOUBLING_METRICS
+            )
+        df = pd.read_csv(path)
         df['date'] = pd.to_datetime(df['date'])
+        df = add_derived_metrics(df)
         return df
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
 
+@st.cache_data(ttl=3600, max_entries=64)
+def query_duckdb(query, parquet_path, parquet_mtime, *args):
+    """Run a covid_duckdb query, cached per Parquet file version and filter arguments"""
+    return getattr(covid_duckdb, query)(parquet_path, *args)
+
 # Load data with progress indicator
 with st.spinner("Loading latest COVID-19 data..."):
-    df = load_data()
+    data = load_data()
 
-if df is not None:
+if data is not None:
+    # Only the small result frames below are materialized for the DuckDB backend
+    use_duckdb = DATA_BACKEND == "duckdb"
+    df = None if use_duckdb else data
+    parquet_mtime = data.stat().st_mtime if use_duckdb else None
+    
     # Sidebar filters
     st.sidebar.header("📊 Dashboard Filters")
     
+    if use_duckdb:
+        locations = query_duckdb("query_locations", data, parquet_mtime)
+    else:
+        locations = df[['continent', 'location']].drop_duplicates()
+    
     # Get unique continents and countries
-    continents = ['All'] + sorted(df['continent'].dropna().unique().tolist())
+    continents = ['All'] + sorted(locations['continent'].dropna().unique().tolist())
     selected_continent = st.sidebar.selectbox("Select Continent", continents)
     
     # Filter countries based on continent
     if selected_continent == 'All':
-        countries = sorted(df['location'].unique().tolist())
+        countries = sorted(locations['location'].unique().tolist())
     else:
-        countries = sorted(df[df['continent'] == selected_continent]['location'].unique().tolist())
+        countries = sorted(locations[locations['continent'] == selected_continent]['location'].unique().tolist())
     
     selected_countries = st.sidebar.multiselect(
         "Select Countries (max 10)",
@@ -67,8 +102,11 @@ if df is not None:
     )[:10]
     
     # Date range filter
-    min_date = df['date'].min().date()
-    max_date = df['date'].max().date()
+    if use_duckdb:
+        min_date, max_date = query_duckdb("query_date_bounds", data, parquet_mtime)
+    else:
+        min_date, max_date = df['date'].min(), df['date'].max()
+    min_date, max_date = min_date.date(), max_date.date()
     
     date_range = st.sidebar.date_input(
         "Select Date Range",
@@ -81,11 +119,15 @@ if df is not None:
     metric = st.sidebar.selectbox(
         "Select Metric",
         ["total_cases", "new_cases", "total_deaths", "new_deaths", 
-         "total_vaccinations", "people_fully_vaccinated"]
+         "total_vaccinations", "people_fully_vaccinated"] + DERIVED_METRICS
     )
     
     # Filter data
-    if len(date_range) == 2:
+    if use_duckdb:
+        filtered_df = query_duckdb(
+            "query_filtered", data, parquet_mtime, selected_countries, date_range
+        )
+    elif len(date_range) == 2:
         mask = (
             (df['location'].isin(selected_countries)) &
             (df['date'].dt.date >= date_range[0]) &
@@ -99,7 +141,13 @@ if df is not None:
     st.header("📈 Key Global Metrics")
     col1, col2, col3, col4 = st.columns(4)
     
-    latest_data = df[df['date'] == df['date'].max()]
+    if use_duckdb:
+        latest_cols = list(dict.fromkeys(
+            ['iso_code', 'location', 'total_cases', 'total_deaths', 'total_vaccinations', metric]
+        ))
+        latest_data = query_duckdb("query_latest", data, parquet_mtime, latest_cols)
+    else:
+        latest_data = df[df['date'] == df['date'].max()]
     
     with col1:
         total_cases = latest_data['total_cases'].sum()
@@ -114,7 +162,7 @@ if df is not None:
         st.metric("Total Vaccinations", f"{total_vaccinations:,.0f}")
     
     with col4:
-        countries_affected = df['location'].nunique()
+        countries_affected = locations['location'].nunique()
         st.metric("Countries Affected", f"{countries_affected}")
     
     st.markdown("---")
@@ -159,20 +207,24 @@ if df is not None:
             # Pie chart - Distribution
             st.subheader("🥧 Distribution")
             
-            fig_pie = px.pie(
-                latest_filtered,
-                values=metric,
-                names='location',
-                title=f"{metric.replace('_', ' ').title()} Distribution",
-                template='plotly_white'
-            )
-            fig_pie.update_layout(height=400)
-            st.plotly_chart(fig_pie, use_container_width=True)
+            if metric in RATE_METRICS:
+                # Rates can be negative and don't add up to a total across countries
+                st.info(f"{metric.replace('_', ' ').title()} is a rate, so it has no distribution across countries.")
+            else:
+                fig_pie = px.pie(
+                    latest_filtered,
+                    values=metric,
+                    names='location',
+                    title=f"{metric.replace('_', ' ').title()} Distribution",
+                    template='plotly_white'
+                )
+                fig_pie.update_layout(height=400)
+                st.plotly_chart(fig_pie, use_container_width=True)
         
         # Geographical visualization
         st.header("🗺️ Global Heatmap")
         
-        world_data = df[df['date'] == df['date'].max()].copy()
+        world_data = latest_data.copy()
         
         fig_map = px.choropleth(
             world_data,
@@ -193,7 +245,13 @@ if df is not None:
         available_cols = [col for col in summary_cols if col in filtered_df.columns]
         
         if available_cols:
-            summary_stats = filtered_df.groupby('location')[available_cols].agg(['mean', 'max', 'min', 'std']).round(2)
+            if use_duckdb:
+                summary_stats = query_duckdb(
+                    "query_summary", data, parquet_mtime,
+                    selected_countries, date_range, available_cols
+                ).round(2)
+            else:
+                summary_stats = filtered_df.groupby('location')[available_cols].agg(['mean', 'max', 'min', 'std']).round(2)
             st.dataframe(summary_stats, use_container_width=True)
         
         # Download section
@@ -0,0 +1,210 @@
+"""
+COVID-19 DuckDB Query Backend
+Author: Jasmit Singh Dhall
+Description: Out-of-core queries for the COVID-19 dashboard over a local Parquet file
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+# OWID columns that hold text; every other column except `date` is numeric
+TEXT_COLUMNS = ["iso_code", "continent", "location", "tests_units"]
+
+# Bump when the Parquet layout or column typing changes
+PARQUET_VERSION = 2
+
+
+def _connect(parquet_path):
+    """Open an in-memory DuckDB connection with a `covid` view over the Parquet file"""
+    con = duckdb.connect()
+    path = str(parquet_path).replace("'", "''")
+    con.execute(f"CREATE VIEW covid AS SELECT * FROM read_parquet('{path}')")
+    return con
+
+
+def _quote(column):
+    """Quote a column name for use in SQL"""
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _filter_clause(countries, date_range):
+    """Build the WHERE clause and parameters for the sidebar filters"""
+    if not countries:
+        return "WHERE FALSE", []
+    clause = f"WHERE location IN ({', '.join('?' * len(countries))})"
+    params = list(countries)
+    if len(date_range) == 2:
+        clause += " AND date BETWEEN ? AND ?"
+        params += [date_range[0], date_range[1]]
+    return clause, params
+
+
+def _typed_columns(con, source):
+    """SELECT list that types the CSV columns the way pandas.read_csv does for OWID"""
+    # Type inference marks columns that are empty in the sample as VARCHAR, so
+    # read everything as text and cast the numeric columns explicitly
+    columns = [
+        row[0] for row in
+        con.execute(f"DESCRIBE SELECT * FROM read_csv('{source}', all_varchar = true)").fetchall()
+    ]
+    select = []
+    for col in columns:
+        if col in TEXT_COLUMNS:
+            select.append(_quote(col))
+        elif col == "date":
+            select.append("CAST(date AS DATE) AS date")
+        else:
+            select.append(f"TRY_CAST({_quote(col)} AS DOUBLE) AS {_quote(col)}")
+    return ", ".join(select)
+
+
+def build_parquet(csv_path, rolling_windows, rolling_metrics, growth_metrics, doubling_metrics):
+    """Convert the OWID CSV to a location-sorted Parquet file with derived metrics"""
+    csv_path = Path(csv_path)
+
+    # Name the file after the derived-metric spec so a changed spec is rebuilt
+    spec = repr((PARQUET_VERSION, rolling_windows, rolling_metrics, growth_metrics, doubling_metrics))
+    digest = hashlib.sha1(spec.encode()).hexdigest()[:10]
+    parquet_path = csv_path.with_name(f"{csv_path.stem}-{digest}.parquet")
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= csv_path.stat().st_mtime:
+        return parquet_path
+
+    by_location = "PARTITION BY location ORDER BY date"
+
+    # 7/14-day rolling averages and their per-million normalizations
+    rolling = []
+    for window in rolling_windows:
+        frame = f"({by_location} ROWS BETWEEN {window - 1} PRECEDING AND CURRENT ROW)"
+        for col in rolling_metrics:
+            rolling.append((f"{col}_{window}d_avg", f"AVG({_quote(col)}) OVER {frame}"))
+    rolling_exprs = [f"{expr} AS {_quote(name)}" for name, expr in rolling]
+    rolling_exprs += [
+        f"{expr} / NULLIF(population, 0) * 1e6 AS {_quote(name + '_per_million')}"
+        for name, expr in rolling
+    ]
+
+    # Week-over-week growth (%) of the 7-day average
+    growth_exprs = [
+        f"({_quote(col + '_7d_avg')} / NULLIF(LAG({_quote(col + '_7d_avg')}, 7) "
+        f"OVER ({by_location}), 0) - 1) * 100 AS {_quote(col + '_wow_growth')}"
+        for col in growth_metrics
+    ]
+
+    # Doubling time (days) of cumulative totals over the last week
+    doubling_exprs = []
+    for col in doubling_metrics:
+        # A zero total a week earlier has no defined doubling time
+        prev = f"LAG({_quote(col)}, 7) OVER ({by_location})"
+        ratio = f"{_quote(col)} / CASE WHEN {prev} > 0 THEN {prev} END"
+        doubling_exprs.append(
+            f"CASE WHEN {ratio} > 1 THEN 7 * LN(2) / LN({ratio}) END "
+            f"AS {_quote(col + '_doubling_days')}"
+        )
+
+    derived = [name for name, _ in rolling]
+    derived += [name + '_per_million' for name, _ in rolling]
+    derived += [col + '_wow_growth' for col in growth_metrics]
+    derived += [col + '_doubling_days' for col in doubling_metrics]
+    casts = ", ".join(f"CAST({_quote(name)} AS FLOAT) AS {_quote(name)}" for name in derived)
+
+    source = str(csv_path).replace("'", "''")
+    tmp_path = parquet_path.with_name(parquet_path.name + ".tmp")
+    con = duckdb.connect()
+    try:
+        query = f"""
+            WITH raw AS (
+                SELECT {_typed_columns(con, source)} FROM read_csv('{source}', all_varchar = true)
+            ), smoothed AS (
+                SELECT *, {', '.join(rolling_exprs)} FROM raw
+            ), derived AS (
+                SELECT *, {', '.join(growth_exprs + doubling_exprs)} FROM smoothed
+            )
+            SELECT * EXCLUDE ({', '.join(_quote(name) for name in derived)}), {casts}
+            FROM derived
+            ORDER BY location, date
+        """
+
+        # Write to a temporary file so readers never see a half-written Parquet
+        target = str(tmp_path).replace("'", "''")
+        con.execute(f"COPY ({query}) TO '{target}' (FORMAT PARQUET)")
+    finally:
+        con.close()
+    os.replace(tmp_path, parquet_path)
+
+    # Drop Parquet files built for an older spec
+    for stale in csv_path.parent.glob(f"{csv_path.stem}-*.parquet"):
+        if stale != parquet_path:
+            stale.unlink(missing_ok=True)
+    return parquet_path
+
+
+def query_locations(parquet_path):
+    """Distinct (continent, location) pairs for the sidebar filters"""
+    con = _connect(parquet_path)
+    try:
+        return con.execute("SELECT DISTINCT continent, location FROM covid").df()
+    finally:
+        con.close()
+
+
+def query_date_bounds(parquet_path):
+    """Earliest and latest dates in the dataset"""
+    con = _connect(parquet_path)
+    try:
+        min_date, max_date = con.execute("SELECT MIN(date), MAX(date) FROM covid").fetchone()
+        return pd.Timestamp(min_date), pd.Timestamp(max_date)
+    finally:
+        con.close()
+
+
+def query_filtered(parquet_path, countries, date_range, columns=None):
+    """Rows for the selected countries and date range, optionally pruned to `columns`"""
+    clause, params = _filter_clause(countries, date_range)
+    select = ", ".join(_quote(col) for col in columns) if columns else "*"
+    con = _connect(parquet_path)
+    try:
+        return con.execute(
+            f"SELECT {select} FROM covid {clause} ORDER BY location, date", params
+        ).df()
+    finally:
+        con.close()
+
+
+def query_latest(parquet_path, columns):
+    """Rows for the most recent date across all locations, pruned to `columns`"""
+    select = ", ".join(_quote(col) for col in columns)
+    con = _connect(parquet_path)
+    try:
+        return con.execute(
+            f"SELECT {select} FROM covid WHERE date = (SELECT MAX(date) FROM covid)"
+        ).df()
+    finally:
+        con.close()
+
+
+def query_summary(parquet_path, countries, date_range, columns):
+    """Per-location mean/max/min/std of `columns`, shaped like a pandas groupby().agg()"""
+    clause, params = _filter_clause(countries, date_range)
+    stats = [("mean", "AVG"), ("max", "MAX"), ("min", "MIN"), ("std", "STDDEV_SAMP")]
+    aggs = ", ".join(
+        f"{func}({_quote(col)}) AS {_quote(col + '_' + name)}"
+        for col in columns for name, func in stats
+    )
+    con = _connect(parquet_path)
+    try:
+        summary = con.execute(
+            f"SELECT location, {aggs} FROM covid {clause} GROUP BY location ORDER BY location",
+            params
+        ).df()
+    finally:
+        con.close()
+
+    summary = summary.set_index('location')
+    summary.columns = pd.MultiIndex.from_tuples(
+        [(col, name) for col in columns for name, _ in stats]
+    )
+    return summary
@@ -0,0 +1,65 @@
+"""
+COVID-19 Derived Metrics Engine
+Author: Jasmit Singh Dhall
+Description: Rolling, per-million, growth and doubling-time metrics for the OWID time series
+"""
+
+import numpy as np
+import pandas as pd
+
+# Derived metrics settings
+ROLLING_WINDOWS = [7, 14]
+ROLLING_METRICS = ["new_cases", "new_deaths"]
+GROWTH_METRICS = ["new_cases", "new_deaths"]
+DOUBLING_METRICS = ["total_cases", "total_deaths"]
+
+# Derived column names, in the order the dashboard lists them
+ROLLING_AVERAGES = [f"{col}_{window}d_avg" for col in ROLLING_METRICS for window in ROLLING_WINDOWS]
+PER_MILLION = [f"{col}_per_million" for col in ROLLING_AVERAGES]
+GROWTH_RATES = [f"{col}_wow_growth" for col in GROWTH_METRICS]
+DOUBLING_TIMES = [f"{col}_doubling_days" for col in DOUBLING_METRICS]
+DERIVED_METRICS = ROLLING_AVERAGES + PER_MILLION + GROWTH_RATES + DOUBLING_TIMES
+
+# Rates are not parts of a whole, so they have no meaningful share per country
+RATE_METRICS = PER_MILLION + GROWTH_RATES + DOUBLING_TIMES
+
+
+def add_derived_metrics(df):
+    """Precompute rolling, per-million, growth and doubling-time metrics per location"""
+    # Sort once so every grouped window runs over contiguous, ordered rows
+    df = df.sort_values(['location', 'date']).reset_index(drop=True)
+    grouped = df.groupby('location', sort=False)
+    derived = {}
+
+    # 7/14-day rolling averages
+    for window in ROLLING_WINDOWS:
+        rolled = (
+            grouped[ROLLING_METRICS]
+            .rolling(window, min_periods=1)
+            .mean()
+            .reset_index(level=0, drop=True)
+        )
+        for col in ROLLING_METRICS:
+            derived[f"{col}_{window}d_avg"] = rolled[col]
+
+    # Per-million normalizations of the smoothed series
+    population = df['population'].where(df['population'] > 0)
+    for col in list(derived):
+        derived[f"{col}_per_million"] = derived[col] / population * 1e6
+
+    # Week-over-week growth (%) of the 7-day average
+    for col in GROWTH_METRICS:
+        avg = derived[f"{col}_7d_avg"]
+        prev = avg.groupby(df['location'], sort=False).shift(7)
+        derived[f"{col}_wow_growth"] = (avg / prev - 1) * 100
+
+    # Doubling time (days) of cumulative totals over the last week
+    for col in DOUBLING_METRICS:
+        # A zero total a week earlier has no defined doubling time
+        prev = grouped[col].shift(7).where(lambda s: s > 0)
+        ratio = df[col] / prev
+        derived[f"{col}_doubling_days"] = 7 * np.log(2) / np.log(ratio.where(ratio > 1))
+
+    derived = pd.DataFrame(derived)[DERIVED_METRICS]
+    derived = derived.replace([np.inf, -np.inf], np.nan).astype('float32')
+    return pd.concat([df, derived], axis=1)
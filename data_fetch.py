@@ -0,0 +1,203 @@
+"""
+Concurrent Data Fetching Utilities
+Author: Jasmit Singh Dhall
+Description: Async downloads with a pooled HTTP client, bounded retries, resumable
+             streaming to disk and fallback to the last good local copy
+"""
+
+import asyncio
+import os
+from pathlib import Path
+
+import httpx
+import pandas as pd
+
+# Fetch settings
+CACHE_DIR = Path(os.environ.get("DATA_CACHE_DIR", "data_cache"))
+MAX_CONCURRENCY = 8
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 1.0
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = httpx.Timeout(30.0, pool=None)
+
+
+def _is_retryable(error):
+    """Retry transport failures, rate limits and server errors, not other 4xx"""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, (httpx.TransportError, ValueError))
+
+
+def _is_retryable_ticker_error(error):
+    """Retry network failures and Yahoo rate limits; bad symbols and missing data fail fast"""
+    # OSError covers the requests and curl_cffi exceptions. YFRateLimitError only
+    # exists in newer yfinance releases, so it is matched by name.
+    return isinstance(error, OSError) or type(error).__name__ == "YFRateLimitError"
+
+
+def _validator(response):
+    """Strong ETag or Last-Modified of a response, usable in an If-Range header"""
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _range_start(response):
+    """First byte position of a 206 response's Content-Range, or None"""
+    unit, _, spec = response.headers.get("Content-Range", "").partition(" ")
+    first = spec.split("-", 1)[0]
+    return int(first) if unit == "bytes" and first.isdigit() else None
+
+
+def _discard(*paths):
+    """Remove leftover partial-download files"""
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+async def download_file(client, url, dest, retries=MAX_RETRIES, backoff=BACKOFF_SECONDS):
+    """Stream a URL to disk, resuming a partial download; fall back to the last good copy"""
+    dest = Path(dest)
+    part = dest.with_name(dest.name + ".part")
+    validator_file = dest.with_name(dest.name + ".part.validator")
+    last_error = None
+
+    for attempt in range(retries + 1):
+        try:
+            # Only resume a partial download whose remote version is known
+            validator = validator_file.read_text() if validator_file.exists() else None
+            offset = part.stat().st_size if part.exists() and validator else 0
+
+            # Ask for unencoded bytes so the offset counts the same bytes as Range
+            headers = {"Accept-Encoding": "identity"}
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                headers["If-Range"] = validator
+
+            async with client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 416:
+                    _discard(part, validator_file)
+                    raise ValueError(f"Cannot resume download of {url}")
+                response.raise_for_status()
+
+                if response.status_code == 206:
+                    # The server must resume exactly where we stopped, on the same version
+                    if _range_start(response) != offset or _validator(response) not in (None, validator):
+                        _discard(part, validator_file)
+                        raise ValueError(f"Partial download of {url} no longer matches the remote file")
+                    mode = "ab" if offset else "wb"
+                else:
+                    # A full response (including a failed If-Range) starts over
+                    mode = "wb"
+                    new_validator = _validator(response)
+                    encoded = response.headers.get("Content-Encoding", "identity") != "identity"
+                    if new_validator and not encoded:
+                        validator_file.write_text(new_validator)
+                    else:
+                        validator_file.unlink(missing_ok=True)
+
+                with open(part, mode) as f:
+                    async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                        f.write(chunk)
+
+            # Only a complete download replaces the last good copy
+            os.replace(part, dest)
+            validator_file.unlink(missing_ok=True)
+            return dest
+        except (httpx.HTTPError, ValueError) as e:
+            last_error = e
+            if attempt == retries or not _is_retryable(e):
+                break
+            await asyncio.sleep(backoff * 2 ** attempt)
+
+    if dest.exists():
+        return dest
+    raise last_error
+
+
+async def fetch_urls(urls, cache_dir=CACHE_DIR, max_concurrency=MAX_CONCURRENCY,
+                     retries=MAX_RETRIES, backoff=BACKOFF_SECONDS, transport=None):
+    """Download {name: url} sources concurrently; return {name: path or exception}"""
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    limits = httpx.Limits(max_connections=max_concurrency)
+
+    async with httpx.AsyncClient(
+        limits=limits, timeout=TIMEOUT, follow_redirects=True, transport=transport
+    ) as client:
+        async def fetch_one(name, url):
+            async with semaphore:
+                return await download_file(
+                    client, url, cache_dir / name, retries=retries, backoff=backoff
+                )
+
+        results = await asyncio.gather(
+            *(fetch_one(name, url) for name, url in urls.items()),
+            return_exceptions=True
+        )
+
+    return dict(zip(urls, results))
+
+
+async def fetch_tickers(symbols, start, end, cache_dir=CACHE_DIR,
+                        max_concurrency=MAX_CONCURRENCY, retries=MAX_RETRIES,
+                        backoff=BACKOFF_SECONDS, auto_adjust=False):
+    """Download price history for many tickers concurrently; return {symbol: DataFrame or exception}"""
+    # yfinance manages its own HTTP session, so each ticker runs in a worker thread
+    import yfinance as yf
+
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    prices = "adjusted" if auto_adjust else "raw"
+
+    async def fetch_one(symbol):
+        # The fallback copy is only valid for the exact request it came from
+        path = cache_dir / f"{symbol}_{start}_{end}_{prices}.pkl"
+        last_error = None
+
+        async with semaphore:
+            for attempt in range(retries + 1):
+                try:
+                    # raise_errors makes history() raise instead of logging and
+                    # returning an empty frame, so failures can be classified
+                    data = await asyncio.to_thread(
+                        yf.Ticker(symbol).history, start=start, end=end,
+                        auto_adjust=auto_adjust, raise_errors=True
+                    )
+                    if data.empty:
+                        raise ValueError(f"No data returned for {symbol}")
+                    # Tz-naive index, as yf.download() returns
+                    data.index = data.index.tz_localize(None)
+                    tmp = path.with_name(path.name + ".tmp")
+                    data.to_pickle(tmp)
+                    os.replace(tmp, path)
+                    return data
+                except Exception as e:
+                    last_error = e
+                    if attempt == retries or not _is_retryable_ticker_error(e):
+                        break
+                    await asyncio.sleep(backoff * 2 ** attempt)
+
+        if path.exists():
+            return pd.read_pickle(path)
+        raise last_error
+
+    results = await asyncio.gather(
+        *(fetch_one(symbol) for symbol in symbols),
+        return_exceptions=True
+    )
+    return dict(zip(symbols, results))
+
+
+def fetch_urls_sync(urls, **kwargs):
+    """Blocking wrapper around fetch_urls for scripts and Streamlit apps"""
+    return asyncio.run(fetch_urls(urls, **kwargs))
+
+
+def fetch_tickers_sync(symbols, start, end, **kwargs):
+    """Blocking wrapper around fetch_tickers for scripts and Streamlit apps"""
+    return asyncio.run(fetch_tickers(symbols, start, end, **kwargs))
@@ -106,6 +106,134 @@ def generate_sample_data():
     
     return pd.DataFrame(data)
 
+def filter_data(df, date_range, categories, regions):
+    """Apply the sidebar filters to the sales data"""
+    mask = (df['Category'].isin(categories)) & (df['Region'].isin(regions))
+    if len(date_range) == 2:
+        mask &= (
+            (df['Date'].dt.date >= date_range[0]) &
+            (df['Date'].dt.date <= date_range[1])
+        )
+    return df[mask].copy()
+
+# The heavy computations below are memoized per filter state. The full
+# dataframe is passed as `_df` so Streamlit skips hashing it; the cache key
+# is the (date_range, categories, regions) tuple instead. Each cache keeps
+# only the most recent filter states so memory stays bounded.
+CACHE_MAX_ENTRIES = 16
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES)
+def train_forecast_model(_df, date_range, categories, regions):
+    """Train the Random Forest revenue model for a filter state"""
+    filtered_df = filter_data(_df, date_range, categories, regions)
+    
+    # Aggregate by date
+    ml_data = filtered_df.groupby('Date').agg({
+        'Revenue': 'sum',
+        'OrderID': 'count',
+        'Quantity': 'sum'
+    }).reset_index()
+    
+    # Feature engineering
+    ml_data['DayOfYear'] = ml_data['Date'].dt.dayofyear
+    ml_data['Month'] = ml_data['Date'].dt.month
+    ml_data['DayOfWeek'] = ml_data['Date'].dt.dayofweek
+    ml_data['Quarter'] = ml_data['Date'].dt.quarter
+    ml_data['WeekOfYear'] = ml_data['Date'].dt.isocalendar().week
+    
+    # Rolling features
+    ml_data['Revenue_MA7'] = ml_data['Revenue'].rolling(window=7, min_periods=1).mean()
+    ml_data['Revenue_MA30'] = ml_data['Revenue'].rolling(window=30, min_periods=1).mean()
+    
+    ml_data = ml_data.fillna(0)
+    
+    # Train-test split
+    features = ['DayOfYear', 'Month', 'DayOfWeek', 'Quarter', 'WeekOfYear', 
+                'OrderID', 'Quantity', 'Revenue_MA7', 'Revenue_MA30']
+    
+    X = ml_data[features]
+    y = ml_data['Revenue']
+    
+    split_idx = int(len(X) * 0.8)
+    X_train, X_test = X[:split_idx], X[split_idx:]
+    y_train, y_test = y[:split_idx], y[split_idx:]
+    
+    # Train model
+    model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
+    model.fit(X_train, y_train)
+    
+    # Predictions
+    y_pred = model.predict(X_test)
+    
+    # Metrics
+    mae = mean_absolute_error(y_test, y_pred)
+    r2 = r2_score(y_test, y_pred)
+    
+    test_dates = ml_data['Date'].iloc[split_idx:].reset_index(drop=True)
+    results_df = pd.DataFrame({
+        'Date': test_dates,
+        'Actual': y_test.values,
+        'Predicted': y_pred
+    })
+    
+    importance_df = pd.DataFrame({
+        'Feature': features,
+        'Importance': model.feature_importances_
+    }).sort_values('Importance', ascending=False)
+    
+    return mae, r2, results_df, importance_df
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES)
+def segment_customers(_df, date_range, categories, regions, n_clusters):
+    """Run K-Means customer segmentation for a filter state"""
+    filtered_df = filter_data(_df, date_range, categories, regions)
+    
+    # Prepare customer data
+    customer_features = filtered_df.groupby('CustomerID').agg({
+        'Revenue': 'sum',
+        'OrderID': 'count',
+        'CustomerAge': 'first'
+    }).reset_index()
+    customer_features.columns = ['CustomerID', 'TotalSpent', 'OrderCount', 'Age']
+    customer_features['AvgOrderValue'] = customer_features['TotalSpent'] / customer_features['OrderCount']
+    
+    # Standardize features
+    scaler = StandardScaler()
+    features_scaled = scaler.fit_transform(customer_features[['TotalSpent', 'OrderCount', 'AvgOrderValue', 'Age']])
+    
+    # K-Means clustering
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+    customer_features['Segment'] = kmeans.fit_predict(features_scaled)
+    customer_features['Segment'] = 'Segment ' + (customer_features['Segment'] + 1).astype(str)
+    
+    segment_stats = customer_features.groupby('Segment').agg({
+        'CustomerID': 'count',
+        'TotalSpent': 'mean',
+        'OrderCount': 'mean',
+        'AvgOrderValue': 'mean'
+    }).reset_index()
+    
+    return customer_features, segment_stats
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES)
+def build_reports(_df, date_range, categories, regions):
+    """Build the detailed report tables and CSV export for a filter state"""
+    filtered_df = filter_data(_df, date_range, categories, regions)
+    
+    top_products = filtered_df.groupby('Product')['Revenue'].sum().sort_values(ascending=False).head(10).reset_index()
+    
+    monthly_summary = filtered_df.groupby('Month').agg({
+        'Revenue': 'sum',
+        'OrderID': 'count',
+        'CustomerID': 'nunique',
+        'Quantity': 'sum'
+    }).reset_index()
+    monthly_summary.columns = ['Month', 'Total Revenue', 'Total Orders', 'Unique Customers', 'Items Sold']
+    
+    csv = filtered_df.to_csv(index=False)
+    
+    return top_products, monthly_summary, csv
+
 # Load data
 with st.spinner("Loading sales data..."):
     df = generate_sample_data()
@@ -140,16 +268,13 @@ regions = st.sidebar.multiselect(
 )
 
 # Filter data
-if len(date_range) == 2:
-    mask = (
-        (df['Date'].dt.date >= date_range[0]) &
-        (df['Date'].dt.date <= date_range[1]) &
-        (df['Category'].isin(categories)) &
-        (df['Region'].isin(regions))
-    )
-    filtered_df = df[mask].copy()
-else:
-    filtered_df = df[(df['Category'].isin(categories)) & (df['Region'].isin(regions))].copy()
+# Normalized filter state, used as the cache key for the per-view computations
+filter_state = (
+    tuple(date_range),
+    tuple(sorted(categories)),
+    tuple(sorted(regions))
+)
+filtered_df = filter_data(df, *filter_state)
 
 # Key Metrics
 st.header("📈 Key Performance Indicators")
@@ -173,10 +298,16 @@ with col4:
 
 st.markdown("---")
 
-# Tabs for different analyses
-tab1, tab2, tab3, tab4 = st.tabs(["📊 Sales Analysis", "🤖 ML Forecasting", "👥 Customer Segmentation", "📋 Detailed Reports"])
+# View selector for different analyses. Unlike st.tabs, only the selected
+# view's body runs on a rerun, so the models are trained on demand.
+view = st.radio(
+    "Select Analysis",
+    ["📊 Sales Analysis", "🤖 ML Forecasting", "👥 Customer Segmentation", "📋 Detailed Reports"],
+    horizontal=True,
+    label_visibility="collapsed"
+)
 
-with tab1:
+if view == "📊 Sales Analysis":
     st.header("Sales Trends & Analysis")
     
     col1, col2 = st.columns(2)
@@ -248,54 +379,13 @@ with tab1:
     )
     st.plotly_chart(fig_dow, use_container_width=True)
 
-with tab2:
+elif view == "🤖 ML Forecasting":
     st.header("🤖 ML-Based Sales Forecasting")
     
-    # Prepare data for ML
     st.subheader("Revenue Prediction Model")
     
-    # Aggregate by date
-    ml_data = filtered_df.groupby('Date').agg({
-        'Revenue': 'sum',
-        'OrderID': 'count',
-        'Quantity': 'sum'
-    }).reset_index()
-    
-    # Feature engineering
-    ml_data['DayOfYear'] = ml_data['Date'].dt.dayofyear
-    ml_data['Month'] = ml_data['Date'].dt.month
-    ml_data['DayOfWeek'] = ml_data['Date'].dt.dayofweek
-    ml_data['Quarter'] = ml_data['Date'].dt.quarter
-    ml_data['WeekOfYear'] = ml_data['Date'].dt.isocalendar().week
-    
-    # Rolling features
-    ml_data['Revenue_MA7'] = ml_data['Revenue'].rolling(window=7, min_periods=1).mean()
-    ml_data['Revenue_MA30'] = ml_data['Revenue'].rolling(window=30, min_periods=1).mean()
-    
-    ml_data = ml_data.fillna(0)
-    
-    # Train-test split
-    features = ['DayOfYear', 'Month', 'DayOfWeek', 'Quarter', 'WeekOfYear', 
-                'OrderID', 'Quantity', 'Revenue_MA7', 'Revenue_MA30']
-    
-    X = ml_data[features]
-    y = ml_data['Revenue']
-    
-    split_idx = int(len(X) * 0.8)
-    X_train, X_test = X[:split_idx], X[split_idx:]
-    y_train, y_test = y[:split_idx], y[split_idx:]
-    
-    # Train model
     with st.spinner("Training Random Forest model..."):
-        model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
-        model.fit(X_train, y_train)
-        
-        # Predictions
-        y_pred = model.predict(X_test)
-        
-        # Metrics
-        mae = mean_absolute_error(y_test, y_pred)
-        r2 = r2_score(y_test, y_pred)
+        mae, r2, results_df, importance_df = train_forecast_model(df, *filter_state)
     
     col1, col2 = st.columns(2)
     with col1:
@@ -304,13 +394,6 @@ with tab2:
         st.metric("R² Score", f"{r2:.4f}")
     
     # Visualization
-    test_dates = ml_data['Date'].iloc[split_idx:].reset_index(drop=True)
-    results_df = pd.DataFrame({
-        'Date': test_dates,
-        'Actual': y_test.values,
-        'Predicted': y_pred
-    })
-    
     fig_pred = go.Figure()
     fig_pred.add_trace(go.Scatter(x=results_df['Date'], y=results_df['Actual'], 
                                    name='Actual', line=dict(color='#3498db')))
@@ -321,10 +404,6 @@ with tab2:
     
     # Feature importance
     st.subheader("Feature Importance")
-    importance_df = pd.DataFrame({
-        'Feature': features,
-        'Importance': model.feature_importances_
-    }).sort_values('Importance', ascending=False)
     
     fig_importance = px.bar(
         importance_df,
@@ -336,28 +415,13 @@ with tab2:
     )
     st.plotly_chart(fig_importance, use_container_width=True)
 
-with tab3:
+elif view == "👥 Customer Segmentation":
     st.header("👥 Customer Segmentation (K-Means Clustering)")
     
-    # Prepare customer data
-    customer_features = filtered_df.groupby('CustomerID').agg({
-        'Revenue': 'sum',
-        'OrderID': 'count',
-        'CustomerAge': 'first'
-    }).reset_index()
-    customer_features.columns = ['CustomerID', 'TotalSpent', 'OrderCount', 'Age']
-    customer_features['AvgOrderValue'] = customer_features['TotalSpent'] / customer_features['OrderCount']
-    
-    # Standardize features
-    scaler = StandardScaler()
-    features_scaled = scaler.fit_transform(customer_features[['TotalSpent', 'OrderCount', 'AvgOrderValue', 'Age']])
-    
-    # K-Means clustering
     n_clusters = st.slider("Select Number of Customer Segments", 2, 6, 3)
     
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-    customer_features['Segment'] = kmeans.fit_predict(features_scaled)
-    customer_features['Segment'] = 'Segment ' + (customer_features['Segment'] + 1).astype(str)
+    with st.spinner("Clustering customers..."):
+        customer_features, segment_stats = segment_customers(df, *filter_state, n_clusters)
     
     # Visualize segments
     col1, col2 = st.columns(2)
@@ -375,13 +439,6 @@ with tab3:
         st.plotly_chart(fig_seg1, use_container_width=True)
     
     with col2:
-        segment_stats = customer_features.groupby('Segment').agg({
-            'CustomerID': 'count',
-            'TotalSpent': 'mean',
-            'OrderCount': 'mean',
-            'AvgOrderValue': 'mean'
-        }).reset_index()
-        
         fig_seg2 = px.bar(
             segment_stats,
             x='Segment',
@@ -398,28 +455,21 @@ with tab3:
     segment_stats.columns = ['Segment', 'Customer Count', 'Avg Total Spent', 'Avg Orders', 'Avg Order Value']
     st.dataframe(segment_stats.round(2), use_container_width=True)
 
-with tab4:
+else:
     st.header("📋 Detailed Analytics Reports")
     
+    top_products, monthly_summary, csv = build_reports(df, *filter_state)
+    
     # Top products
     st.subheader("Top 10 Products by Revenue")
-    top_products = filtered_df.groupby('Product')['Revenue'].sum().sort_values(ascending=False).head(10).reset_index()
     st.dataframe(top_products, use_container_width=True)
     
     # Monthly summary
     st.subheader("Monthly Performance Summary")
-    monthly_summary = filtered_df.groupby('Month').agg({
-        'Revenue': 'sum',
-        'OrderID': 'count',
-        'CustomerID': 'nunique',
-        'Quantity': 'sum'
-    }).reset_index()
-    monthly_summary.columns = ['Month', 'Total Revenue', 'Total Orders', 'Unique Customers', 'Items Sold']
     st.dataframe(monthly_summary.round(2), use_container_width=True)
     
     # Download option
     st.subheader("💾 Export Data")
-    csv = filtered_df.to_csv(index=False)
     st.download_button(
         label="📥 Download Filtered Data",
         data=csv,
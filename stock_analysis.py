@@ -2,7 +2,6 @@
 # STOCK PRICE PREDICTION PROJECT
 # ================================
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import matplotlib
@@ -13,11 +12,15 @@ from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 
+from data_fetch import fetch_tickers_sync
+
 
 
 # 1️⃣ Download stock data
 stock_symbol = "AAPL"   # You can change to TCS.NS, RELIANCE.NS etc.
-data = yf.download(stock_symbol, start="2015-01-01", end="2025-01-01")
+data = fetch_tickers_sync([stock_symbol], start="2015-01-01", end="2025-01-01")[stock_symbol]
+if isinstance(data, Exception):
+    raise SystemExit(f"Unable to download {stock_symbol} data: {data}")
 
 # 2️⃣ Use only Close price
 data = data[['Close']]
@@ -0,0 +1,147 @@
+"""
+Parity tests for the DuckDB backend against the pandas backend of the COVID-19 dashboard
+"""
+
+import datetime
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+duckdb = pytest.importorskip("duckdb")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import covid_duckdb
+from covid_metrics import (
+    ROLLING_WINDOWS, ROLLING_METRICS, GROWTH_METRICS, DOUBLING_METRICS,
+    DERIVED_METRICS, add_derived_metrics
+)
+
+COUNTRIES = ["Alpha", "Beta"]
+DATE_RANGE = (datetime.date(2021, 1, 10), datetime.date(2021, 1, 30))
+SUMMARY_COLS = ["total_cases", "total_deaths", "new_cases", "new_deaths"]
+
+
+def make_csv(path):
+    """Small OWID-shaped CSV with zero-start totals, null columns, zero population and shuffled rows"""
+    rng = np.random.default_rng(0)
+    rows = []
+    locations = [
+        ("AAA", "Europe", "Alpha", 2e6),
+        ("BBB", "Asia", "Beta", 5e5),
+        ("OWID_WRL", None, "World", 0.0),
+    ]
+    for iso_code, continent, location, population in locations:
+        total_cases = total_deaths = 0.0
+        for i, date in enumerate(pd.date_range("2021-01-01", periods=40)):
+            new_cases = float(rng.integers(0, 50)) if rng.random() > 0.1 else np.nan
+            new_deaths = 1.0 if i > 12 else 0.0
+            total_cases += 0 if np.isnan(new_cases) else new_cases
+            total_deaths += new_deaths
+            rows.append({
+                "iso_code": iso_code,
+                "continent": continent,
+                "location": location,
+                "date": date.strftime("%Y-%m-%d"),
+                "total_cases": total_cases,
+                "new_cases": new_cases,
+                "total_deaths": total_deaths,
+                "new_deaths": new_deaths,
+                "total_vaccinations": np.nan,
+                "people_fully_vaccinated": np.nan,
+                "tests_units": "tests performed",
+                "population": population,
+            })
+    pd.DataFrame(rows).sample(frac=1, random_state=1).to_csv(path, index=False)
+
+
+@pytest.fixture
+def backends(tmp_path):
+    csv_path = tmp_path / "owid-covid-data.csv"
+    make_csv(csv_path)
+
+    df = pd.read_csv(csv_path)
+    df["date"] = pd.to_datetime(df["date"])
+    df = add_derived_metrics(df)
+
+    parquet_path = covid_duckdb.build_parquet(
+        csv_path, ROLLING_WINDOWS, ROLLING_METRICS, GROWTH_METRICS, DOUBLING_METRICS
+    )
+    return df, parquet_path
+
+
+def pandas_filtered(df):
+    mask = (
+        (df["location"].isin(COUNTRIES)) &
+        (df["date"].dt.date >= DATE_RANGE[0]) &
+        (df["date"].dt.date <= DATE_RANGE[1])
+    )
+    return df[mask]
+
+
+def assert_frames_match(expected, actual):
+    expected = expected.sort_values(["location", "date"] if "date" in expected else ["location"])
+    actual = actual.sort_values(["location", "date"] if "date" in actual else ["location"])
+    pd.testing.assert_frame_equal(
+        expected.reset_index(drop=True), actual[expected.columns].reset_index(drop=True),
+        check_dtype=False, rtol=1e-5
+    )
+
+
+def test_numeric_columns_have_numeric_types(backends):
+    df, parquet_path = backends
+    result = covid_duckdb.query_filtered(parquet_path, ["World"], ())
+    for col in ["total_vaccinations", "people_fully_vaccinated", "population"]:
+        assert result[col].dtype.kind == "f"
+    for col in DERIVED_METRICS:
+        assert result[col].dtype == np.float32
+
+
+def test_derived_metrics_match(backends):
+    df, parquet_path = backends
+    result = covid_duckdb.query_filtered(parquet_path, ["Alpha", "Beta", "World"], ())
+    assert_frames_match(df[["location", "date"] + DERIVED_METRICS], result)
+
+
+def test_filtered_rows_match(backends):
+    df, parquet_path = backends
+    result = covid_duckdb.query_filtered(parquet_path, COUNTRIES, DATE_RANGE)
+    assert_frames_match(pandas_filtered(df), result)
+
+
+def test_no_countries_returns_no_rows(backends):
+    _, parquet_path = backends
+    assert covid_duckdb.query_filtered(parquet_path, [], DATE_RANGE).empty
+
+
+def test_latest_values_match(backends):
+    df, parquet_path = backends
+    columns = ["iso_code", "location", "total_cases", "total_deaths", "total_vaccinations"]
+    result = covid_duckdb.query_latest(parquet_path, columns)
+    assert_frames_match(df[df["date"] == df["date"].max()][columns], result)
+
+
+def test_summary_matches(backends):
+    df, parquet_path = backends
+    expected = pandas_filtered(df).groupby("location")[SUMMARY_COLS].agg(["mean", "max", "min", "std"])
+    result = covid_duckdb.query_summary(parquet_path, COUNTRIES, DATE_RANGE, SUMMARY_COLS)
+    pd.testing.assert_frame_equal(expected, result, check_dtype=False, rtol=1e-5)
+
+
+def test_locations_and_date_bounds_match(backends):
+    df, parquet_path = backends
+    locations = covid_duckdb.query_locations(parquet_path)
+    assert sorted(locations["location"]) == sorted(df["location"].unique())
+    assert covid_duckdb.query_date_bounds(parquet_path) == (df["date"].min(), df["date"].max())
+
+
+def test_changed_spec_rebuilds_parquet(backends, tmp_path):
+    _, parquet_path = backends
+    rebuilt = covid_duckdb.build_parquet(
+        tmp_path / "owid-covid-data.csv", [7], ROLLING_METRICS, GROWTH_METRICS, DOUBLING_METRICS
+    )
+    assert rebuilt != parquet_path
+    assert list(tmp_path.glob("*.parquet")) == [rebuilt]
@@ -0,0 +1,82 @@
+"""
+Tests for the COVID-19 derived metrics engine
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from covid_metrics import DERIVED_METRICS, add_derived_metrics
+
+
+def make_frame():
+    """Two locations with distinct series, rows shuffled across locations and dates"""
+    dates = pd.date_range("2021-01-01", periods=21)
+    rows = []
+    for location, population, scale in [("A", 2e6, 1.0), ("B", 0.0, 10.0)]:
+        for i, date in enumerate(dates):
+            rows.append({
+                "location": location,
+                "date": date,
+                "new_cases": scale * (i + 1),
+                "new_deaths": 0.0 if i < 10 else 1.0,
+                "total_cases": scale * (i + 1) * (i + 2) / 2,
+                "total_deaths": max(0, i - 9),
+                "population": population,
+            })
+    return pd.DataFrame(rows).sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+@pytest.fixture
+def metrics():
+    return add_derived_metrics(make_frame())
+
+
+def location(df, name):
+    return df[df["location"] == name].reset_index(drop=True)
+
+
+def test_adds_float32_columns_sorted_by_location_and_date(metrics):
+    assert all(metrics[col].dtype == np.float32 for col in DERIVED_METRICS)
+    assert metrics[["location", "date"]].equals(
+        metrics[["location", "date"]].sort_values(["location", "date"]).reset_index(drop=True)
+    )
+
+
+def test_rolling_averages_stay_within_each_location(metrics):
+    for name in ["A", "B"]:
+        loc = location(metrics, name)
+        for window in [7, 14]:
+            expected = loc["new_cases"].rolling(window, min_periods=1).mean()
+            np.testing.assert_allclose(loc[f"new_cases_{window}d_avg"], expected, rtol=1e-6)
+
+
+def test_per_million_uses_population_and_skips_zero_population(metrics):
+    a, b = location(metrics, "A"), location(metrics, "B")
+    np.testing.assert_allclose(
+        a["new_cases_7d_avg_per_million"], a["new_cases_7d_avg"] / 2e6 * 1e6, rtol=1e-6
+    )
+    assert b["new_cases_7d_avg_per_million"].isna().all()
+
+
+def test_week_over_week_growth(metrics):
+    a = location(metrics, "A")
+    avg = a["new_cases_7d_avg"].astype("float64")
+    expected = (avg / avg.shift(7) - 1) * 100
+    assert a["new_cases_wow_growth"].iloc[:7].isna().all()
+    np.testing.assert_allclose(a["new_cases_wow_growth"].iloc[7:], expected.iloc[7:], rtol=1e-5)
+
+
+def test_doubling_time_undefined_when_prior_total_is_zero(metrics):
+    a = location(metrics, "A")
+    deaths = a["total_deaths_doubling_days"]
+    # total_deaths is 0 up to day 9, so the lagged total is positive from day 17
+    assert deaths.iloc[:17].isna().all()
+    ratio = a["total_deaths"].iloc[17] / a["total_deaths"].iloc[10]
+    assert deaths.iloc[17] == pytest.approx(7 * np.log(2) / np.log(ratio), rel=1e-5)
+    assert (deaths.dropna() > 0).all()
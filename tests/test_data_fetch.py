@@ -0,0 +1,260 @@
+"""
+Tests for data_fetch against a local stand-in HTTP server and a fake yfinance
+"""
+
+import sys
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from data_fetch import fetch_tickers_sync, fetch_urls_sync
+
+V1 = b"v1-" + b"y" * 5000
+V2 = b"v2-" + b"z" * 5000
+
+
+class StandInServer:
+    """Serves one body per path with ETag, Range and If-Range support"""
+
+    def __init__(self):
+        self.bodies = {}
+        self.etags = {}
+        self.failures = {}
+        self.requests = []
+        self.ignore_range_start = False
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                if server.failures.get(self.path, 0) > 0:
+                    server.failures[self.path] -= 1
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                if self.path not in server.bodies:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                body, etag = server.bodies[self.path], server.etags[self.path]
+                start = 0
+                range_header = self.headers.get("Range")
+                if_range = self.headers.get("If-Range")
+                if range_header and (if_range is None or if_range == etag):
+                    start = int(range_header.split("=")[1].rstrip("-"))
+                    if server.ignore_range_start:
+                        start = 0
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+                else:
+                    self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body) - start))
+                self.end_headers()
+                self.wfile.write(body[start:])
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def serve(self, path, body, etag):
+        self.bodies[path] = body
+        self.etags[path] = etag
+
+
+@pytest.fixture
+def server():
+    server = StandInServer()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+def fetch(server, names, cache_dir):
+    urls = {name: server.base + path for name, path in names.items()}
+    return fetch_urls_sync(urls, cache_dir=cache_dir, retries=2, backoff=0)
+
+
+def write_partial(cache_dir, name, data, etag):
+    (cache_dir / f"{name}.part").write_bytes(data)
+    (cache_dir / f"{name}.part.validator").write_text(etag)
+
+
+def test_fetches_concurrently_and_retries_server_errors(server, tmp_path):
+    server.serve("/a.csv", V1, '"1"')
+    server.serve("/b.csv", V2, '"2"')
+    server.failures["/b.csv"] = 2
+
+    result = fetch(server, {"a.csv": "/a.csv", "b.csv": "/b.csv"}, tmp_path)
+
+    assert result["a.csv"].read_bytes() == V1
+    assert result["b.csv"].read_bytes() == V2
+    assert not list(tmp_path.glob("*.part*"))
+
+
+def test_requests_unencoded_bytes(server, tmp_path):
+    server.serve("/a.csv", V1, '"1"')
+
+    fetch(server, {"a.csv": "/a.csv"}, tmp_path)
+
+    assert server.requests[0][1]["Accept-Encoding"] == "identity"
+
+
+def test_resumes_partial_download_of_same_version(server, tmp_path):
+    server.serve("/a.csv", V1, '"1"')
+    write_partial(tmp_path, "a.csv", V1[:1000], '"1"')
+
+    result = fetch(server, {"a.csv": "/a.csv"}, tmp_path)
+
+    headers = server.requests[0][1]
+    assert headers["Range"] == "bytes=1000-"
+    assert headers["If-Range"] == '"1"'
+    assert result["a.csv"].read_bytes() == V1
+
+
+def test_restarts_when_remote_file_changed(server, tmp_path):
+    server.serve("/a.csv", V2, '"2"')
+    write_partial(tmp_path, "a.csv", V1[:1000], '"1"')
+
+    result = fetch(server, {"a.csv": "/a.csv"}, tmp_path)
+
+    assert result["a.csv"].read_bytes() == V2
+
+
+def test_discards_partial_without_validator(server, tmp_path):
+    server.serve("/a.csv", V2, '"2"')
+    (tmp_path / "a.csv.part").write_bytes(V1[:1000])
+
+    result = fetch(server, {"a.csv": "/a.csv"}, tmp_path)
+
+    assert "Range" not in server.requests[0][1]
+    assert result["a.csv"].read_bytes() == V2
+
+
+def test_discards_partial_on_content_range_mismatch(server, tmp_path):
+    server.serve("/a.csv", V1, '"1"')
+    server.ignore_range_start = True
+    write_partial(tmp_path, "a.csv", V1[:1000], '"1"')
+
+    result = fetch(server, {"a.csv": "/a.csv"}, tmp_path)
+
+    assert len(server.requests) == 2
+    assert result["a.csv"].read_bytes() == V1
+
+
+def test_falls_back_to_last_good_copy_without_retrying_client_errors(server, tmp_path):
+    (tmp_path / "a.csv").write_bytes(V1)
+
+    result = fetch(server, {"a.csv": "/missing.csv"}, tmp_path)
+
+    assert len(server.requests) == 1
+    assert result["a.csv"].read_bytes() == V1
+
+
+def test_returns_error_when_no_local_copy(server, tmp_path):
+    result = fetch(server, {"a.csv": "/missing.csv"}, tmp_path)
+
+    assert isinstance(result["a.csv"], httpx.HTTPStatusError)
+
+
+class YFRateLimitError(Exception):
+    """Stand-in for the rate-limit error raised by newer yfinance releases"""
+
+
+class FakeYFinance(types.ModuleType):
+    """yfinance replacement whose history() replays scripted outcomes"""
+
+    def __init__(self):
+        super().__init__("yfinance")
+        self.outcomes = []
+        self.calls = []
+        fake = self
+
+        class Ticker:
+            def __init__(self, symbol):
+                self.symbol = symbol
+
+            def history(self, **kwargs):
+                fake.calls.append((self.symbol, kwargs))
+                outcome = fake.outcomes.pop(0)
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+
+        self.Ticker = Ticker
+
+
+def prices(start, periods):
+    index = pd.date_range(start, periods=periods, tz="America/New_York", name="Date")
+    return pd.DataFrame({"Close": range(periods)}, index=index, dtype=float)
+
+
+@pytest.fixture
+def yfinance(monkeypatch):
+    fake = FakeYFinance()
+    monkeypatch.setitem(sys.modules, "yfinance", fake)
+    return fake
+
+
+def fetch_ticker(tmp_path, start="2020-01-01", end="2020-02-01"):
+    return fetch_tickers_sync(["AAPL"], start, end, cache_dir=tmp_path, retries=2, backoff=0)["AAPL"]
+
+
+def test_ticker_requests_unadjusted_prices_with_naive_index(yfinance, tmp_path):
+    yfinance.outcomes = [prices("2020-01-02", 5)]
+
+    data = fetch_ticker(tmp_path)
+
+    kwargs = yfinance.calls[0][1]
+    assert kwargs["auto_adjust"] is False
+    assert kwargs["raise_errors"] is True
+    assert data.index.tz is None
+
+
+@pytest.mark.parametrize("error", [ConnectionError("reset"), YFRateLimitError("too many")])
+def test_ticker_retries_transient_errors(yfinance, tmp_path, error):
+    yfinance.outcomes = [error, prices("2020-01-02", 5)]
+
+    data = fetch_ticker(tmp_path)
+
+    assert len(yfinance.calls) == 2
+    assert len(data) == 5
+
+
+def test_ticker_does_not_retry_permanent_errors(yfinance, tmp_path):
+    yfinance.outcomes = [KeyError("delisted")]
+
+    result = fetch_ticker(tmp_path)
+
+    assert len(yfinance.calls) == 1
+    assert isinstance(result, KeyError)
+
+
+def test_ticker_falls_back_to_copy_for_same_range(yfinance, tmp_path):
+    yfinance.outcomes = [prices("2020-01-02", 5)] + [ConnectionError("down")] * 3
+
+    fetch_ticker(tmp_path)
+    data = fetch_ticker(tmp_path)
+
+    assert len(yfinance.calls) == 4
+    assert len(data) == 5
+
+
+def test_ticker_ignores_copy_for_other_range(yfinance, tmp_path):
+    yfinance.outcomes = [prices("2015-01-02", 100)] + [ConnectionError("down")] * 3
+
+    fetch_ticker(tmp_path, "2015-01-01", "2025-01-01")
+    result = fetch_ticker(tmp_path)
+
+    assert isinstance(result, ConnectionError)